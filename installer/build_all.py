@@ -16,22 +16,37 @@ import os
 import sys
 import shutil
 import argparse
+import math
+import hashlib
+import functools
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+_TOML_ERRORS = (tomllib.TOMLDecodeError,) if tomllib is not None else ()
 
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 DIST_DIR = PROJECT_ROOT / "dist"
+BUILD_CACHE_DIR = PROJECT_ROOT / ".build_cache"
+BUILD_HASH_FILE = BUILD_CACHE_DIR / "last_build.hash"
+
+# Environment for child processes, captured once; callers' overrides are merged per call
+_BASE_ENV = os.environ.copy()
 
 
 def run_command(cmd: list, cwd: Path = None, env: dict = None) -> bool:
     """Run a command and return success status."""
     print(f"\n>> {' '.join(cmd)}")
     
-    full_env = os.environ.copy()
-    if env:
-        full_env.update(env)
+    full_env = {**_BASE_ENV, **env} if env else _BASE_ENV
     
     result = subprocess.run(
         cmd,
@@ -42,30 +57,29 @@ def run_command(cmd: list, cwd: Path = None, env: dict = None) -> bool:
     return result.returncode == 0
 
 
-def check_rust_toolchain() -> bool:
-    """Check if Rust toolchain is available."""
+def check_rust_toolchain() -> Optional[str]:
+    """Check if Rust toolchain is available.
+    
+    Returns the ``rustc --version`` output, or None if Rust is not installed.
+    """
     print("Checking Rust toolchain...")
     
     try:
-        result = subprocess.run(
-            ["rustc", "--version"],
-            capture_output=True,
-            text=True
-        )
-        print(f"  Found: {result.stdout.strip()}")
+        # Spawn both version probes at once
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            results = list(ex.map(
+                lambda cmd: subprocess.run(cmd, capture_output=True, text=True),
+                [["rustc", "--version"], ["cargo", "--version"]]
+            ))
         
-        result = subprocess.run(
-            ["cargo", "--version"],
-            capture_output=True,
-            text=True
-        )
-        print(f"  Found: {result.stdout.strip()}")
+        for result in results:
+            print(f"  Found: {result.stdout.strip()}")
         
-        return True
+        return results[0].stdout.strip()
     except FileNotFoundError:
         print("ERROR: Rust toolchain not found!")
         print("Install from: https://rustup.rs/")
-        return False
+        return None
 
 
 def check_android_targets() -> bool:
@@ -91,29 +105,95 @@ def check_android_targets() -> bool:
     
     if missing:
         print(f"Installing missing targets: {missing}")
-        for target in missing:
-            run_command(["rustup", "target", "add", target])
+        # One rustup invocation installs every target
+        run_command(["rustup", "target", "add", *missing])
     else:
         print("  All Android targets installed")
     
     return True
 
 
-def build_rust_project(release: bool = True, skip_tests: bool = False) -> bool:
+def default_jobs() -> int:
+    """Pick a cargo job count that respects CPU affinity and container quotas."""
+    env_jobs = os.environ.get("CARGO_BUILD_JOBS", "")
+    if env_jobs.isdigit() and int(env_jobs) > 0:
+        return int(env_jobs)
+    
+    if hasattr(os, "sched_getaffinity"):
+        jobs = len(os.sched_getaffinity(0))
+    else:
+        jobs = os.cpu_count() or 1
+    
+    # cgroup v2 CPU quota, e.g. "200000 100000" (quota period) or "max 100000"
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        if quota != "max":
+            jobs = min(jobs, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    
+    return jobs
+
+
+def _build_output(release: bool) -> Path:
+    """Path of the main executable produced by the Rust build."""
+    exe_name = "r-droid.exe" if os.name == "nt" else "r-droid"
+    return PROJECT_ROOT / "target" / ("release" if release else "debug") / exe_name
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for job counts; rejects values below 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _project_hash(release: bool, skip_tests: bool, rustc_version: str = "") -> str:
+    """Fingerprint the Rust build inputs from file paths, sizes and mtimes."""
+    inputs = [PROJECT_ROOT / "Cargo.toml", PROJECT_ROOT / "Cargo.lock",
+              PROJECT_ROOT / ".cargo" / "config.toml"]
+    for subdir in ["src", "crates"]:
+        inputs.extend(p for p in (PROJECT_ROOT / subdir).rglob("*") if p.is_file())
+    
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"release={release}:skip_tests={skip_tests}:rustc={rustc_version}".encode())
+    for p in sorted(inputs):
+        if p.exists():
+            st = p.stat()
+            h.update(f"{p}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+def build_rust_project(release: bool = True, skip_tests: bool = False,
+                       jobs: Optional[int] = None, rustc_version: str = "") -> bool:
     """Build the Rust project."""
     print("\n" + "="*60)
     print("Building Rust Project")
     print("="*60)
     
+    # Skip the build when nothing changed since the last successful one
+    # and its output is still there (e.g. not removed by a manual cargo clean)
+    project_hash = _project_hash(release, skip_tests, rustc_version)
+    if (BUILD_HASH_FILE.exists() and BUILD_HASH_FILE.read_text().strip() == project_hash
+            and _build_output(release).exists()):
+        print("\nRust project is up-to-date, skipping build")
+        return True
+    
+    jobs_args = ["--jobs", str(jobs or default_jobs())]
+    
     # Run tests first (unless skipped)
     if not skip_tests:
         print("\nRunning tests...")
-        if not run_command(["cargo", "test", "--workspace"]):
+        if not run_command(["cargo", "test", "--workspace", *jobs_args]):
             print("Tests failed!")
             return False
     
     # Build release or debug
-    build_args = ["cargo", "build", "--workspace"]
+    build_args = ["cargo", "build", "--workspace", *jobs_args]
     if release:
         build_args.append("--release")
     
@@ -122,11 +202,14 @@ def build_rust_project(release: bool = True, skip_tests: bool = False) -> bool:
         print("Build failed!")
         return False
     
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    BUILD_HASH_FILE.write_text(project_hash)
+    
     print("\nBuild successful!")
     return True
 
 
-def build_installer(version: str) -> bool:
+def build_installer(version: str, jobs: Optional[int] = None) -> bool:
     """Build the Windows installer."""
     print("\n" + "="*60)
     print("Building Windows Installer")
@@ -141,20 +224,32 @@ def build_installer(version: str) -> bool:
         str(SCRIPT_DIR / "build_installer.py"),
         "--version", version,
         "--portable"
-    ])
+    ], env={"CARGO_BUILD_JOBS": str(jobs or default_jobs())})
+
+
+@functools.lru_cache(maxsize=1)
+def _load_cargo_manifest() -> dict:
+    """Parse the root Cargo.toml once and cache the result."""
+    with open(PROJECT_ROOT / "Cargo.toml", "rb") as f:
+        return tomllib.load(f)
 
 
 def generate_version() -> str:
     """Generate version string from Cargo.toml."""
-    cargo_toml = PROJECT_ROOT / "Cargo.toml"
-    
-    if cargo_toml.exists():
-        content = cargo_toml.read_text()
-        for line in content.split("\n"):
-            if line.startswith("version = "):
-                version = line.split('"')[1]
-                print(f"Version from Cargo.toml: {version}")
-                return version
+    try:
+        if tomllib is not None:
+            version = _load_cargo_manifest()["package"]["version"]
+        else:
+            # No TOML parser before Python 3.11; take the first version line
+            content = (PROJECT_ROOT / "Cargo.toml").read_text(encoding="utf-8")
+            version = next(
+                line.split('"')[1] for line in content.split("\n")
+                if line.startswith("version = ")
+            )
+        print(f"Version from Cargo.toml: {version}")
+        return version
+    except (FileNotFoundError, KeyError, StopIteration, *_TOML_ERRORS):
+        pass
     
     # Fallback to date-based version
     return datetime.now().strftime("0.%Y.%m%d")
@@ -170,6 +265,10 @@ def clean_build() -> None:
     # Clean dist
     if DIST_DIR.exists():
         shutil.rmtree(DIST_DIR)
+    
+    # Forget the last build fingerprint
+    if BUILD_CACHE_DIR.exists():
+        shutil.rmtree(BUILD_CACHE_DIR)
 
 
 def generate_release_notes(version: str) -> Path:
@@ -252,6 +351,12 @@ def main():
         "--version", "-v",
         help="Override version string"
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=_positive_int,
+        default=None,
+        help="Number of parallel cargo jobs (default: available CPUs)"
+    )
     
     args = parser.parse_args()
     
@@ -260,7 +365,8 @@ def main():
     print("="*60)
     
     # Check prerequisites
-    if not check_rust_toolchain():
+    rustc_version = check_rust_toolchain()
+    if rustc_version is None:
         return 1
     
     check_android_targets()
@@ -269,6 +375,9 @@ def main():
     version = args.version or generate_version()
     print(f"\nBuilding version: {version}")
     
+    jobs = args.jobs if args.jobs is not None else default_jobs()
+    print(f"Using {jobs} parallel jobs")
+    
     # Clean if requested
     if args.clean:
         clean_build()
@@ -276,13 +385,15 @@ def main():
     # Build Rust project
     if not build_rust_project(
         release=not args.debug,
-        skip_tests=args.skip_tests
+        skip_tests=args.skip_tests,
+        jobs=jobs,
+        rustc_version=rustc_version
     ):
         return 1
     
     # Build installer
     if not args.skip_installer:
-        if not build_installer(version):
+        if not build_installer(version, jobs):
             print("Warning: Installer build failed (WiX may not be installed)")
     
     # Generate release notes
@@ -295,9 +406,11 @@ def main():
     
     if DIST_DIR.exists():
         print("\nGenerated files:")
-        for f in DIST_DIR.iterdir():
-            size = f.stat().st_size / 1024 / 1024
-            print(f"  - {f.name} ({size:.2f} MB)")
+        with os.scandir(DIST_DIR) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            size = entry.stat().st_size / 1024 / 1024
+            print(f"  - {entry.name} ({size:.2f} MB)")
     
     return 0
 
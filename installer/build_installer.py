@@ -22,11 +22,14 @@ import hashlib
 import tempfile
 import argparse
 import subprocess
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, Iterator
+from zlib import crc32
 from xml.etree import ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import escape
 
 # Version constants
 DEFAULT_VERSION = "0.1.0"
@@ -40,6 +43,21 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 BUILD_DIR = PROJECT_ROOT / "target" / "release"
 DIST_DIR = PROJECT_ROOT / "dist"
 
+# Read size when streaming large artifacts (hash fallback, ZIP writes)
+IO_CHUNK_SIZE = 1 << 20
+
+# Timestamp stamped on every portable ZIP entry (earliest DOS date)
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Maps file name characters to underscores when deriving WiX identifiers
+_ID_XLATE = str.maketrans({"-": "_", ".": "_"})
+
+# Same for Directory IDs, which are derived from backslash-separated paths
+_DIR_ID_XLATE = str.maketrans({"\\": "_", "-": "_", ".": "_"})
+
+# Extra entities escaped inside double-quoted XML attribute values
+_ATTR_ENTITIES = {'"': "&quot;"}
+
 
 @dataclass
 class InstallerConfig:
@@ -60,6 +78,9 @@ class InstallerConfig:
     create_desktop_shortcut: bool = True
     create_start_menu_shortcut: bool = True
     add_to_path: bool = True
+    
+    # Generate the WXS through ElementTree instead of the string builder
+    legacy_xml: bool = False
 
 
 @dataclass
@@ -74,7 +95,55 @@ class FileEntry:
     def __post_init__(self):
         # Generate component ID if not provided
         if not self.component_id:
-            self.component_id = f"Component_{self.target_name.replace('.', '_').replace('-', '_')}"
+            self.component_id = f"Component_{self.target_name.translate(_ID_XLATE)}"
+
+
+def _directory_id(dir_path: str) -> str:
+    """Derive the WiX Directory ID for an INSTALLFOLDER-relative path."""
+    return dir_path.translate(_DIR_ID_XLATE)
+
+
+def _iter_files(root: str, include_dirs: bool = False) -> Iterator[os.DirEntry]:
+    """Yield the files under root, reusing scandir's cached stat results.
+    
+    With ``include_dirs`` the subdirectories are yielded as well.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    if include_dirs:
+                        yield entry
+                elif entry.is_file():
+                    yield entry
+
+
+class _XmlWriter:
+    """Write-only XML builder matching the layout of ET.indent output."""
+    
+    def __init__(self):
+        self.parts: List[str] = ["<?xml version='1.0' encoding='utf-8'?>"]
+        self.depth = 0
+    
+    def _start(self, tag: str, attrs: Dict[str, str]) -> str:
+        attr_str = "".join(f' {k}="{escape(v, _ATTR_ENTITIES)}"' for k, v in attrs.items())
+        return f"\n{'  ' * self.depth}<{tag}{attr_str}"
+    
+    def open_tag(self, tag: str, attrs: Dict[str, str]) -> None:
+        self.parts.append(self._start(tag, attrs) + ">")
+        self.depth += 1
+    
+    def close_tag(self, tag: str) -> None:
+        self.depth -= 1
+        self.parts.append(f"\n{'  ' * self.depth}</{tag}>")
+    
+    def leaf(self, tag: str, attrs: Dict[str, str]) -> None:
+        self.parts.append(self._start(tag, attrs) + " />")
+    
+    def to_bytes(self) -> bytes:
+        return "".join(self.parts).encode("utf-8")
 
 
 class InstallerBuilder:
@@ -84,9 +153,16 @@ class InstallerBuilder:
         self.config = config
         self.files: List[FileEntry] = []
         self.directories: Dict[str, str] = {}
+        self.wxs_path: Optional[Path] = None
+        self.msi_path: Optional[Path] = None
+        # WiX stderr is spooled here while it runs in the background
+        self._wix_stderr = None
+        
+    def collect_files(self, assets: Optional[Tuple[List[FileEntry], Dict[str, str]]] = None) -> None:
+        """Collect all files to be included in the installer.
         
-    def collect_files(self) -> None:
-        """Collect all files to be included in the installer."""
+        ``assets`` may carry the result of an earlier ``_prefetch_assets`` call.
+        """
         print("Collecting files...")
         
         # Main executable
@@ -106,43 +182,213 @@ class InstallerBuilder:
             self.files.append(FileEntry(
                 source_path=dll,
                 target_name=dll.name,
-                component_id=f"Component_{dll.stem.replace('-', '_')}"
+                component_id=f"Component_{dll.stem.translate(_ID_XLATE)}"
             ))
         
-        # Resources
-        resources_dir = PROJECT_ROOT / "resources"
-        if resources_dir.exists():
-            self._collect_directory(resources_dir, "resources")
-        
-        # Assets
-        assets_dir = PROJECT_ROOT / "assets"
-        if assets_dir.exists():
-            self._collect_directory(assets_dir, "assets")
+        # Resources and assets
+        if assets is None:
+            assets = self._prefetch_assets()
+        asset_files, asset_dirs = assets
+        self.files.extend(asset_files)
+        self.directories.update(asset_dirs)
             
         print(f"Collected {len(self.files)} files")
     
-    def _collect_directory(self, dir_path: Path, target_subdir: str) -> None:
+    @staticmethod
+    def _prefetch_assets() -> Tuple[List[FileEntry], Dict[str, str]]:
+        """Enumerate resources and assets (independent of the Rust build output)."""
+        files: List[FileEntry] = []
+        directories: Dict[str, str] = {}
+        
+        for subdir in ["resources", "assets"]:
+            src = PROJECT_ROOT / subdir
+            if src.exists():
+                InstallerBuilder._collect_directory(src, subdir, files, directories)
+        
+        return files, directories
+    
+    @staticmethod
+    def _collect_directory(dir_path: Path, target_subdir: str,
+                           files: List[FileEntry], directories: Dict[str, str]) -> None:
         """Recursively collect files from a directory."""
-        for item in dir_path.rglob("*"):
-            if item.is_file():
-                rel_path = item.relative_to(dir_path)
-                target_dir = f"INSTALLFOLDER\\{target_subdir}\\{rel_path.parent}".rstrip("\\.")
+        dir_path_str = str(dir_path)
+        target_prefix = f"INSTALLFOLDER\\{target_subdir}"
+        dir_ids: Dict[str, str] = {}
+        
+        for entry in _iter_files(dir_path_str):
+            parent = os.path.dirname(entry.path)
+            dir_id = dir_ids.get(parent)
+            if dir_id is None:
+                rel_dir = os.path.relpath(parent, dir_path_str)
+                if rel_dir == os.curdir:
+                    target_dir = target_prefix
+                else:
+                    target_dir = target_prefix + "\\" + rel_dir.replace(os.sep, "\\")
                 
                 # Register directory
-                dir_id = target_dir.replace("\\", "_").replace(".", "_")
-                self.directories[target_dir] = dir_id
-                
-                self.files.append(FileEntry(
-                    source_path=item,
-                    target_name=item.name,
-                    component_id=f"Component_{item.stem.replace('-', '_').replace('.', '_')}_{hashlib.md5(str(item).encode()).hexdigest()[:8]}",
-                    directory=dir_id
-                ))
-    
-    def generate_wix_source(self) -> str:
+                dir_id = _directory_id(target_dir)
+                directories[target_dir] = dir_id
+                dir_ids[parent] = dir_id
+            
+            stem = os.path.splitext(entry.name)[0].translate(_ID_XLATE)
+            files.append(FileEntry(
+                source_path=Path(entry.path),
+                target_name=entry.name,
+                component_id=f"Component_{stem}_{crc32(os.fsencode(entry.path)) & 0xFFFFFFFF:08x}",
+                directory=dir_id
+            ))
+    
+    def generate_wix_source(self) -> bytes:
         """Generate WiX source XML."""
         print("Generating WiX source...")
         
+        if self.config.legacy_xml:
+            return self._generate_wix_source_et()
+        
+        w = _XmlWriter()
+        
+        # Root element with namespaces
+        w.open_tag("Wix", {
+            "xmlns": "http://wixtoolset.org/schemas/v4/wxs",
+            "xmlns:ui": "http://wixtoolset.org/schemas/v4/wxs/ui",
+        })
+        
+        # Package element
+        w.open_tag("Package", {
+            "Name": self.config.product_name,
+            "Manufacturer": self.config.manufacturer,
+            "Version": self.config.version,
+            "UpgradeCode": self.config.upgrade_code,
+            "Scope": "perMachine",
+            "Compressed": "yes",
+        })
+        
+        # Upgrade handling (allows upgrades and prevents downgrades)
+        w.leaf("MajorUpgrade", {
+            "DowngradeErrorMessage": "A newer version of [ProductName] is already installed.",
+        })
+        
+        # Media template (embedded cabinet)
+        w.leaf("MediaTemplate", {"EmbedCab": "yes"})
+        
+        # Standard directories
+        w.open_tag("StandardDirectory", {"Id": "ProgramFiles64Folder"})
+        install_attrs = {"Id": "INSTALLFOLDER", "Name": "R-Droid"}
+        tree = self._directory_tree()
+        if tree:
+            w.open_tag("Directory", install_attrs)
+            self._emit_directories(w, tree, "INSTALLFOLDER")
+            w.close_tag("Directory")
+        else:
+            w.leaf("Directory", install_attrs)
+        w.close_tag("StandardDirectory")
+        
+        # Components and files
+        w.open_tag("ComponentGroup", {"Id": "ProductComponents", "Directory": "INSTALLFOLDER"})
+        
+        for file_entry in self.files:
+            component_attrs = {"Id": file_entry.component_id}
+            if file_entry.directory != "INSTALLFOLDER":
+                component_attrs["Directory"] = file_entry.directory
+            
+            file_attrs = {"Source": str(file_entry.source_path), "Name": file_entry.target_name}
+            if file_entry.is_executable:
+                file_attrs["Id"] = "MainExecutable"
+            
+            w.open_tag("Component", component_attrs)
+            w.leaf("File", file_attrs)
+            w.close_tag("Component")
+        
+        # PATH environment variable
+        if self.config.add_to_path:
+            self._emit_path_component(w)
+        
+        w.close_tag("ComponentGroup")
+        
+        # Shortcuts
+        if self.config.create_start_menu_shortcut:
+            self._emit_shortcut(w, "ProgramMenuFolder", "StartMenuShortcut")
+        if self.config.create_desktop_shortcut:
+            self._emit_shortcut(w, "DesktopFolder", "DesktopShortcut")
+        
+        # Feature element
+        w.open_tag("Feature", {"Id": "ProductFeature", "Title": "R-Droid IDE", "Level": "1"})
+        w.leaf("ComponentGroupRef", {"Id": "ProductComponents"})
+        if self.config.create_start_menu_shortcut:
+            w.leaf("ComponentRef", {"Id": "StartMenuShortcut"})
+        if self.config.create_desktop_shortcut:
+            w.leaf("ComponentRef", {"Id": "DesktopShortcut"})
+        if self.config.add_to_path:
+            w.leaf("ComponentRef", {"Id": "PathComponent"})
+        w.close_tag("Feature")
+        
+        # UI configuration
+        w.leaf("ui:WixUI", {"Id": "WixUI_InstallDir"})
+        w.leaf("Property", {"Id": "WIXUI_INSTALLDIR", "Value": "INSTALLFOLDER"})
+        
+        w.close_tag("Package")
+        w.close_tag("Wix")
+        
+        return w.to_bytes()
+    
+    def _directory_tree(self) -> Dict[str, dict]:
+        """Nest the registered directories below INSTALLFOLDER by name."""
+        tree: Dict[str, dict] = {}
+        for dir_path in sorted(self.directories):
+            node = tree
+            for name in dir_path.split("\\")[1:]:
+                node = node.setdefault(name, {})
+        return tree
+    
+    def _emit_directories(self, w: "_XmlWriter", tree: Dict[str, dict], parent_path: str) -> None:
+        """Recursively emit Directory elements."""
+        for name, children in tree.items():
+            dir_path = f"{parent_path}\\{name}"
+            attrs = {"Id": _directory_id(dir_path), "Name": name}
+            if children:
+                w.open_tag("Directory", attrs)
+                self._emit_directories(w, children, dir_path)
+                w.close_tag("Directory")
+            else:
+                w.leaf("Directory", attrs)
+    
+    def _emit_shortcut(self, w: "_XmlWriter", folder_id: str, shortcut_id: str) -> None:
+        """Emit a shortcut to the main executable in a standard folder."""
+        w.open_tag("StandardDirectory", {"Id": folder_id})
+        w.open_tag("Component", {"Id": shortcut_id})
+        w.leaf("Shortcut", {
+            "Id": shortcut_id,
+            "Name": self.config.product_name,
+            "Target": "[INSTALLFOLDER]r-droid.exe",
+            "WorkingDirectory": "INSTALLFOLDER",
+        })
+        w.leaf("RegistryValue", {
+            "Root": "HKCU",
+            "Key": f"Software\\{self.config.manufacturer}\\{self.config.product_name}",
+            "Name": shortcut_id,
+            "Type": "integer",
+            "Value": "1",
+            "KeyPath": "yes",
+        })
+        w.close_tag("Component")
+        w.close_tag("StandardDirectory")
+    
+    def _emit_path_component(self, w: "_XmlWriter") -> None:
+        """Emit component to add installation directory to PATH."""
+        w.open_tag("Component", {"Id": "PathComponent", "Guid": "*"})
+        w.leaf("Environment", {
+            "Id": "PATH",
+            "Name": "PATH",
+            "Value": "[INSTALLFOLDER]",
+            "Permanent": "no",
+            "Part": "last",
+            "Action": "set",
+            "System": "yes",
+        })
+        w.close_tag("Component")
+    
+    def _generate_wix_source_et(self) -> bytes:
+        """Generate WiX source XML through ElementTree (legacy, for validation)."""
         # Create root element with namespaces
         wix = ET.Element("Wix")
         wix.set("xmlns", "http://wixtoolset.org/schemas/v4/wxs")
@@ -175,11 +421,7 @@ class InstallerBuilder:
         install_dir.set("Name", "R-Droid")
         
         # Add subdirectories
-        for dir_path, dir_id in sorted(self.directories.items()):
-            if dir_id != "INSTALLFOLDER":
-                parts = dir_path.split("\\")
-                if len(parts) > 1:
-                    self._add_directory_tree(install_dir, parts[1:], dir_id)
+        self._add_directories(install_dir)
         
         # Add components and files
         component_group = ET.SubElement(package, "ComponentGroup")
@@ -236,30 +478,26 @@ class InstallerBuilder:
         ui_property.set("Id", "WIXUI_INSTALLDIR")
         ui_property.set("Value", "INSTALLFOLDER")
         
-        # Format and return
-        return self._format_xml(wix)
+        # Serialize and return
+        return self._serialize_xml(wix)
     
-    def _add_directory_tree(self, parent: ET.Element, parts: List[str], final_id: str) -> None:
-        """Recursively add directory elements."""
-        if not parts:
-            return
-        
-        dir_name = parts[0]
-        dir_id = f"Dir_{dir_name.replace('-', '_').replace('.', '_')}"
-        
-        # Check if directory already exists
-        existing = parent.find(f"./Directory[@Name='{dir_name}']")
-        if existing is not None:
-            dir_elem = existing
-        else:
-            dir_elem = ET.SubElement(parent, "Directory")
-            dir_elem.set("Id", dir_id if len(parts) == 1 else f"{dir_id}_{id(parts)}")
-            dir_elem.set("Name", dir_name)
-        
-        if len(parts) > 1:
-            self._add_directory_tree(dir_elem, parts[1:], final_id)
-        else:
-            dir_elem.set("Id", final_id)
+    def _add_directories(self, install_dir: ET.Element) -> None:
+        """Add Directory elements for every registered directory in one pass."""
+        elements: Dict[str, ET.Element] = {"INSTALLFOLDER": install_dir}
+        
+        def ensure(dir_path: str) -> ET.Element:
+            # Each path (including file-less parents) is created exactly once
+            dir_elem = elements.get(dir_path)
+            if dir_elem is None:
+                parent_path, _, dir_name = dir_path.rpartition("\\")
+                dir_elem = ET.SubElement(ensure(parent_path), "Directory")
+                dir_elem.set("Id", _directory_id(dir_path))
+                dir_elem.set("Name", dir_name)
+                elements[dir_path] = dir_elem
+            return dir_elem
+        
+        for dir_path in sorted(self.directories):
+            ensure(dir_path)
     
     def _add_shortcuts(self, package: ET.Element) -> None:
         """Add shortcuts to Start Menu and Desktop."""
@@ -322,20 +560,34 @@ class InstallerBuilder:
         env.set("Action", "set")
         env.set("System", "yes")
     
-    def _format_xml(self, root: ET.Element) -> str:
-        """Format XML with proper indentation."""
-        rough_string = ET.tostring(root, encoding="unicode")
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")
+    def _serialize_xml(self, root: ET.Element) -> bytes:
+        """Serialize XML with proper indentation as UTF-8 bytes."""
+        ET.indent(root, space="  ")
+        return ET.tostring(root, encoding="utf-8", xml_declaration=True)
     
     def build(self) -> Path:
         """Build the MSI installer."""
+        return self.finish_build(self.start_build())
+    
+    def start_build(self) -> Optional[subprocess.Popen]:
+        """Generate the WiX source and launch WiX without waiting for it.
+        
+        Returns the running WiX process, or None if WiX is not installed.
+        Pass the result to ``finish_build`` to wait for the MSI.
+        """
         print(f"\n{'='*60}")
         print(f"Building {self.config.product_name} v{self.config.version} Installer")
         print(f"{'='*60}\n")
         
-        # Collect files
-        self.collect_files()
+        # Enumerate resources/assets in the background while WiX is located;
+        # only the exe/DLL collection depends on target/release/
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            assets_future = ex.submit(InstallerBuilder._prefetch_assets)
+            try:
+                wix_path = self._find_wix()
+            except FileNotFoundError:
+                wix_path = None
+            self.collect_files(assets_future.result())
         
         if not self.files:
             raise RuntimeError("No files collected for installer")
@@ -347,40 +599,52 @@ class InstallerBuilder:
         wxs_content = self.generate_wix_source()
         
         # Write WiX source file
-        wxs_path = self.config.output_dir / "r-droid.wxs"
-        wxs_path.write_text(wxs_content, encoding="utf-8")
-        print(f"Generated: {wxs_path}")
+        self.wxs_path = self.config.output_dir / "r-droid.wxs"
+        self.wxs_path.write_bytes(wxs_content)
+        print(f"Generated: {self.wxs_path}")
         
         # Build MSI using WiX
-        msi_path = self.config.output_dir / f"R-Droid-{self.config.version}-x64.msi"
+        self.msi_path = self.config.output_dir / f"R-Droid-{self.config.version}-x64.msi"
         
-        try:
-            # Check for WiX
-            wix_path = self._find_wix()
-            
-            # Run WiX build
-            print("\nRunning WiX build...")
-            result = subprocess.run(
-                [wix_path, "build", "-o", str(msi_path), str(wxs_path)],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                print(f"WiX build failed:\n{result.stderr}")
-                raise RuntimeError("WiX build failed")
-            
-            print(f"\nSuccess! Installer created: {msi_path}")
-            print(f"Size: {msi_path.stat().st_size / 1024 / 1024:.2f} MB")
-            
-            return msi_path
-            
-        except FileNotFoundError:
+        if wix_path is None:
             print("\nWarning: WiX Toolset not found. WXS file generated but MSI not built.")
             print("Install WiX Toolset from: https://wixtoolset.org/")
             print(f"\nTo build manually, run:")
-            print(f"  wix build -o {msi_path} {wxs_path}")
-            return wxs_path
+            print(f"  wix build -o {self.msi_path} {self.wxs_path}")
+            return None
+        
+        print("\nRunning WiX build...")
+        return self._run_wix(wix_path, self.wxs_path, self.msi_path)
+    
+    def finish_build(self, wix_proc: Optional[subprocess.Popen]) -> Path:
+        """Wait for the WiX process started by ``start_build``."""
+        if wix_proc is None:
+            return self.wxs_path
+        
+        wix_proc.wait()
+        
+        # stderr went to a temp file, so WiX never blocked on a full pipe
+        with self._wix_stderr as stderr_file:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace")
+        
+        if wix_proc.returncode != 0:
+            print(f"WiX build failed:\n{stderr}")
+            raise RuntimeError("WiX build failed")
+        
+        print(f"\nSuccess! Installer created: {self.msi_path}")
+        print(f"Size: {self.msi_path.stat().st_size / 1024 / 1024:.2f} MB")
+        
+        return self.msi_path
+    
+    def _run_wix(self, wix_path: str, wxs_path: Path, msi_path: Path) -> subprocess.Popen:
+        """Launch the WiX build in the background."""
+        self._wix_stderr = tempfile.TemporaryFile()
+        return subprocess.Popen(
+            [wix_path, "build", "-o", str(msi_path), str(wxs_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=self._wix_stderr
+        )
     
     def _find_wix(self) -> str:
         """Find WiX executable."""
@@ -391,58 +655,99 @@ class InstallerBuilder:
             r"C:\Program Files\WiX Toolset v4\bin\wix.exe",
         ]
         
-        for loc in locations:
+        def probe(loc: str) -> bool:
             try:
                 result = subprocess.run(
                     [loc, "--version"],
                     capture_output=True,
                     text=True
                 )
-                if result.returncode == 0:
-                    print(f"Found WiX: {loc}")
-                    return loc
+                return result.returncode == 0
             except FileNotFoundError:
-                continue
+                return False
+        
+        # Probe all locations concurrently, keeping the order of preference
+        with ThreadPoolExecutor(max_workers=len(locations)) as ex:
+            found = list(ex.map(probe, locations))
+        
+        for loc, ok in zip(locations, found):
+            if ok:
+                print(f"Found WiX: {loc}")
+                return loc
         
         raise FileNotFoundError("WiX Toolset not found")
 
 
+def _zip_info(arcname: str) -> zipfile.ZipInfo:
+    """Create a ZipInfo with fixed metadata so archives are reproducible."""
+    zinfo = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+    zinfo.external_attr = 0o644 << 16
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    # Level 1 keeps DEFLATE cheap. ZipFile.open(zinfo, "w") takes the level
+    # from the ZipInfo, which only exposes it publicly from Python 3.13;
+    # earlier versions use the private attribute ZipFile.write() itself sets.
+    if sys.version_info >= (3, 13):
+        zinfo.compress_level = 1
+    else:
+        zinfo._compresslevel = 1
+    return zinfo
+
+
+def _zip_dir_info(arcname: str) -> zipfile.ZipInfo:
+    """Create a directory entry with fixed metadata (keeps empty directories)."""
+    zinfo = zipfile.ZipInfo(arcname.rstrip("/") + "/", date_time=ZIP_DATE_TIME)
+    zinfo.external_attr = (0o40755 << 16) | 0x10  # MS-DOS directory flag
+    return zinfo
+
+
+def _zip_write(zf: zipfile.ZipFile, src: Path, arcname: str) -> None:
+    """Stream a file from disk into the archive."""
+    zinfo = _zip_info(arcname)
+    zinfo.file_size = src.stat().st_size
+    with open(src, "rb") as f, zf.open(zinfo, "w") as dest:
+        shutil.copyfileobj(f, dest, IO_CHUNK_SIZE)
+
+
 def create_portable_zip(config: InstallerConfig) -> Path:
     """Create a portable ZIP distribution."""
     print("\nCreating portable ZIP distribution...")
     
     zip_name = f"R-Droid-{config.version}-portable-x64.zip"
     zip_path = config.output_dir / zip_name
+    config.output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Create temp directory for archive contents
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir) / "R-Droid"
-        tmp_path.mkdir()
+    # Write sources straight into the archive, no staging copy
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr(_zip_dir_info("R-Droid"), b"")
         
-        # Copy executable
+        # Executable
         exe_src = BUILD_DIR / "r-droid.exe"
         if exe_src.exists():
-            shutil.copy2(exe_src, tmp_path / "r-droid.exe")
+            _zip_write(zf, exe_src, "R-Droid/r-droid.exe")
         
-        # Copy DLLs
-        for dll in BUILD_DIR.glob("*.dll"):
-            shutil.copy2(dll, tmp_path / dll.name)
+        # DLLs
+        for dll in sorted(BUILD_DIR.glob("*.dll")):
+            _zip_write(zf, dll, f"R-Droid/{dll.name}")
         
-        # Copy resources
+        # Resources
         for subdir in ["resources", "assets"]:
-            src = PROJECT_ROOT / subdir
-            if src.exists():
-                shutil.copytree(src, tmp_path / subdir)
-        
-        # Create portable marker
-        (tmp_path / ".portable").touch()
-        
-        # Create ZIP
-        shutil.make_archive(
-            str(zip_path.with_suffix("")),
-            "zip",
-            tmpdir
-        )
+            src_root = str(PROJECT_ROOT / subdir)
+            if os.path.exists(src_root):
+                zf.writestr(_zip_dir_info(f"R-Droid/{subdir}"), b"")
+                
+                # Directory entries keep empty directories, as make_archive did;
+                # sorted so the archive is reproducible
+                entries = sorted(_iter_files(src_root, include_dirs=True), key=lambda e: e.path)
+                for entry in entries:
+                    rel_path = os.path.relpath(entry.path, src_root).replace(os.sep, "/")
+                    arcname = f"R-Droid/{subdir}/{rel_path}"
+                    if entry.is_dir(follow_symlinks=False):
+                        zf.writestr(_zip_dir_info(arcname), b"")
+                    else:
+                        _zip_write(zf, Path(entry.path), arcname)
+        
+        # Portable marker
+        zf.writestr(_zip_info("R-Droid/.portable"), b"")
     
     print(f"Created: {zip_path}")
     print(f"Size: {zip_path.stat().st_size / 1024 / 1024:.2f} MB")
@@ -450,17 +755,33 @@ def create_portable_zip(config: InstallerConfig) -> Path:
     return zip_path
 
 
+def _hash_one(file_path: Path) -> tuple:
+    """Compute the SHA256 digest of a single file (runs in a worker process)."""
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            # Python 3.11+: hashing loop runs in C
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        else:
+            # Large reads amortize per-call overhead on older Pythons
+            sha256 = hashlib.sha256()
+            for chunk in iter(lambda: f.read(IO_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+            digest = sha256.hexdigest()
+    return file_path.name, digest
+
+
 def create_checksums(files: List[Path]) -> Path:
     """Create SHA256 checksums file."""
-    checksums = []
+    existing = [f for f in files if f.exists()]
     
-    for file_path in files:
-        if file_path.exists():
-            sha256 = hashlib.sha256()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    sha256.update(chunk)
-            checksums.append(f"{sha256.hexdigest()}  {file_path.name}")
+    # Hash independent artifacts in parallel
+    results = []
+    if existing:
+        max_workers = min(len(existing), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            results = list(ex.map(_hash_one, existing))
+    
+    checksums = [f"{digest}  {name}" for name, digest in sorted(results)]
     
     checksum_file = files[0].parent / "SHA256SUMS.txt"
     checksum_file.write_text("\n".join(checksums))
@@ -494,25 +815,46 @@ def main():
         action="store_true",
         help="Skip MSI creation (only create portable if --portable)"
     )
+    parser.add_argument(
+        "--legacy-xml",
+        action="store_true",
+        help="Generate the WiX source with the ElementTree implementation"
+    )
     
     args = parser.parse_args()
     
     config = InstallerConfig(
         version=args.version,
-        output_dir=args.output
+        output_dir=args.output,
+        legacy_xml=args.legacy_xml
     )
     
     created_files = []
     
-    # Build MSI
+    # Start the MSI build; WiX runs in the background
+    builder = None
+    wix_proc = None
     if not args.no_msi:
         builder = InstallerBuilder(config)
-        msi_path = builder.build()
-        created_files.append(msi_path)
+        wix_proc = builder.start_build()
     
-    # Create portable ZIP
+    # Create portable ZIP while WiX compresses its cabinet
+    zip_path = None
     if args.portable:
-        zip_path = create_portable_zip(config)
+        try:
+            zip_path = create_portable_zip(config)
+        except BaseException:
+            # Don't leave WiX running behind a failed ZIP
+            if wix_proc is not None:
+                wix_proc.kill()
+                wix_proc.communicate()
+            raise
+    
+    # Wait for the MSI
+    if builder is not None:
+        created_files.append(builder.finish_build(wix_proc))
+    
+    if zip_path is not None:
         created_files.append(zip_path)
     
     # Create checksums